@@ -7,6 +7,15 @@
 # Python DB-API 2.0 module for Firebird. 
 ##############################################################################
 import sys
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher
+    from cryptography.hazmat.backends import default_backend
+    try:
+        from cryptography.hazmat.decrepit.ciphers.algorithms import ARC4
+    except ImportError:     # cryptography < 43
+        from cryptography.hazmat.primitives.ciphers.algorithms import ARC4
+except ImportError:
+    Cipher = None
 
 PYTHON_MAJOR_VER = sys.version_info[0]
 
@@ -42,3 +51,20 @@ class Arc4:
             else:
                 enc += chr(ord(plain[i]) ^ state[xorIndex])
         return enc
+
+
+class CryptographyArc4:
+    "Arc4 implemented by OpenSSL through cryptography package"
+    def __init__(self, key):
+        cipher = Cipher(ARC4(key), mode=None, backend=default_backend())
+        self.translate = cipher.encryptor().update
+
+
+def get_translator(key):
+    "Return Arc4 translator, use cryptography package if it is available"
+    if Cipher is not None:
+        try:
+            return CryptographyArc4(key)
+        except ValueError:  # key size is not supported
+            pass
+    return Arc4(key)
@@ -9,7 +9,7 @@
 from __future__ import print_function
 import sys
 import warnings
-import xdrlib, time, datetime, decimal, struct
+import time, datetime, decimal, struct
 import itertools
 from collections import Mapping
 from firebirdsql.fberrmsgs import messages
@@ -17,7 +17,8 @@ from firebirdsql import (DatabaseError, InternalError, OperationalError,
     ProgrammingError, IntegrityError, DataError, NotSupportedError,)
 from firebirdsql.consts import *
 from firebirdsql.utils import *
-from firebirdsql.wireprotocol import WireProtocol, INFO_SQL_SELECT_DESCRIBE_VARS
+from firebirdsql.wireprotocol import (WireProtocol, INFO_SQL_SELECT_DESCRIBE_VARS,
+                                      calc_row_layout)
 from firebirdsql.socketstream import SocketStream
 from firebirdsql.xsqlvar import XSQLVAR, calc_blr, parse_select_items, parse_xsqlda
 __version__ = '0.9.4'
@@ -73,8 +74,10 @@ class DBAPITypeObject:
 STRING = DBAPITypeObject(str)
 if PYTHON_MAJOR_VER==3:
     BINARY = DBAPITypeObject(bytes)
+    _TEXT_TYPES = (str,)
 else:
     BINARY = DBAPITypeObject(str)
+    _TEXT_TYPES = (str, unicode)
 NUMBER = DBAPITypeObject(int, decimal.Decimal)
 DATETIME = DBAPITypeObject(datetime.datetime, datetime.date, datetime.time)
 DATE = DBAPITypeObject(datetime.date)
@@ -120,6 +123,7 @@ class Statement(object):
             i += 3 + l
         self.stmt_type, self.xsqlda = parse_xsqlda(buf[i:],
                                     self.trans.connection, self.handle)
+        self.row_layout = calc_row_layout(self.xsqlda)
 
     def open(self):
         DEBUG_OUTPUT("Statement::open()")
@@ -181,11 +185,10 @@ def _fetch_generator(stmt):
             raise StopIteration()
         connection._op_fetch(stmt.handle, calc_blr(stmt.xsqlda))
         (rows, more_data) = connection._op_fetch_response(
-                                        stmt.handle, stmt.xsqlda)
+                                stmt.handle, stmt.xsqlda, stmt.row_layout)
         for r in rows:
             # Convert BLOB handle to data
-            for i in range(len(stmt.xsqlda)):
-                x = stmt.xsqlda[i]
+            for i, x in enumerate(stmt.xsqlda):
                 if x.sqltype == SQL_TYPE_BLOB:
                     if not r[i]:
                         continue
@@ -231,11 +234,11 @@ class Cursor(object):
         return self._transaction
 
     def _convert_params(self, params):
+        str_to_bytes = self.transaction.connection.str_to_bytes
         cooked_params = []
         for param in params:
-            if (type(param)==str or
-                (PYTHON_MAJOR_VER == 2 and type(param)==unicode)):
-                param = self.transaction.connection.str_to_bytes(param)
+            if isinstance(param, _TEXT_TYPES):
+                param = str_to_bytes(param)
             cooked_params.append(param)
         return cooked_params
 
@@ -268,7 +271,8 @@ class Cursor(object):
                 self.transaction.trans_handle, cooked_params,
                 calc_blr(stmt.xsqlda))
             self._callproc_result = \
-                self.transaction.connection._op_sql_response(stmt.xsqlda)
+                self.transaction.connection._op_sql_response(stmt.xsqlda,
+                                                        stmt.row_layout)
             self.transaction.connection._op_response()
             self._fetch_records = None
         else:
@@ -517,7 +521,7 @@ class Connection(WireProtocol):
                     page_size=4096, is_services=False, cloexec=False,
                     timeout=None, isolation_level=None, use_unicode=None,
                     auth_plugin_list=('Srp', 'Legacy_Auth'),
-                    wire_crypt=True, create_new=False):
+                    wire_crypt=True, create_new=False, socket_options=None):
         DEBUG_OUTPUT("Connection::__init__()")
         self.db_handle = None
         if dsn:
@@ -558,7 +562,8 @@ class Connection(WireProtocol):
 
         self._autocommit = False
         self._transaction = None
-        self.sock = SocketStream(self.hostname, self.port, self.timeout, cloexec)
+        self.sock = SocketStream(self.hostname, self.port, self.timeout,
+                                                cloexec, socket_options)
 
         self._op_connect(auth_plugin_list, wire_crypt)
         try:
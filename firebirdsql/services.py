@@ -7,7 +7,7 @@
 # Python DB-API 2.0 module for Firebird. 
 ##############################################################################
 import sys, os, socket
-import xdrlib, time, datetime, decimal, struct
+import time, datetime, decimal, struct
 from firebirdsql.consts import *
 from firebirdsql.utils import *
 from firebirdsql.fbcore import Connection
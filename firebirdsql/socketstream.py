@@ -24,28 +24,90 @@ else:
         fcntl.fcntl(fd, fcntl.F_SETFD, flags | fcntl.FD_CLOEXEC)
 
 class SocketStream(object):
-    def __init__(self, host, port, timeout=None, cloexec=False):
-        self.timeout = timeout
-        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    read_buffer_size = 65536
+
+    def __init__(self, host, port, timeout=None, cloexec=False,
+                                                    socket_options=None):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         if cloexec:
-            setcloexec(self._sock)
-        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-        self._sock.connect((host, port))
+            setcloexec(sock)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # (level, optname, value) tuples, e.g. larger SO_RCVBUF/SO_SNDBUF.
+        # Set before connect() so that they apply to window negotiation.
+        for level, optname, value in socket_options or ():
+            sock.setsockopt(level, optname, value)
+        sock.connect((host, port))
+        self._attach(sock, timeout)
+
+    def _attach(self, sock, timeout):
+        self._sock = sock
+        self.timeout = timeout
         self.read_translator = None
         self.write_translator = None
+        self._rbuf = b''            # unread bytes are _rbuf[_rpos:]
+        self._rpos = 0
 
-    def recv(self, nbytes):
-        b = self._sock.recv(nbytes)
-        if self.read_translator:
-            b = self.read_translator.translate(b)
+    def _fill(self, nbytes):
+        "receive until nbytes are buffered, the peer closes or timeout"
+        chunks = [self._rbuf[self._rpos:]]
+        avail = len(chunks[0])
+        while avail < nbytes:
+            if (self.timeout is not None and
+                select.select([self._sock], [], [], self.timeout)[0] == []):
+                break
+            b = self._sock.recv(max(nbytes - avail, self.read_buffer_size))
+            if not b:
+                break
+            if self.read_translator:
+                b = self.read_translator.translate(b)
+            chunks.append(b)
+            avail += len(b)
+        self._rbuf = b''.join(chunks)
+        self._rpos = 0
+
+    def read(self, nbytes):
+        "read nbytes, fewer if the peer closes or timeout expires"
+        if len(self._rbuf) - self._rpos < nbytes:
+            self._fill(nbytes)
+        pos = self._rpos
+        b = self._rbuf[pos:pos+nbytes]
+        pos += len(b)
+        if pos == len(self._rbuf):  # drained, don't hold on to a big read
+            self._rbuf = b''
+            pos = 0
+        self._rpos = pos
         return b
 
+    def recv(self, nbytes):
+        if self._rpos == len(self._rbuf):
+            self._fill(1)
+        return self.read(min(nbytes, len(self._rbuf) - self._rpos))
+
     def send(self, b):
         if self.write_translator:
             b = self.write_translator.translate(b)
-        n = 0
-        while (n < len(b)):
-            n += self._sock.send(b[n:])
+        self._sock.sendall(b)
+
+    def sendmsg(self, buffers):
+        "send a list of buffers with a single (scatter/gather) write"
+        if self.write_translator:
+            buffers = [self.write_translator.translate(b) for b in buffers]
+        if not hasattr(self._sock, 'sendmsg'):  # Windows or Python 2
+            self._sock.sendall(b''.join(buffers))
+            return
+        n = self._sock.sendmsg(buffers)
+        if n < sum([len(b) for b in buffers]):
+            self._sock.sendall(b''.join(buffers)[n:])
+
+    def cork(self):
+        "hold back partial frames until uncork() (Linux TCP_CORK)"
+        if hasattr(socket, 'TCP_CORK'):
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 1)
+
+    def uncork(self):
+        "flush frames held back by cork()"
+        if hasattr(socket, 'TCP_CORK'):
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 0)
 
     def close(self):
         self._sock.close()
@@ -70,6 +70,10 @@ import hashlib
 import hmac
 import random
 import binascii
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
 
 DEBUG=False
 DEBUG_PRINT=False
@@ -85,6 +89,12 @@ if PYTHON_MAJOR_VER == 3:
 SRP_KEY_SIZE = 128
 SRP_SALT_SIZE = 32
 
+if gmpy2:
+    def powmod(x, y, z):
+        return int(gmpy2.powmod(x, y, z))
+else:
+    powmod = pow
+
 def get_prime():
     N = 0xE67D2E994B2F900C3F41F08F5BB2627ED0D49EE1FE767A52EFCD565CD6E768812C3E1E9CE8F0A8BEA6CB13CD29DDEBF7A96D4A93B55D488DF099A15C89DCB0640738EB2CBDD9A8F7BAB561AB1B0DC1C6CDABF303264A08D1BCA932D1F1EE428B619D970F342ABA9A65793B8B2F041AE5364350C16F735F56ECBCA87BD57B29E7
     g = 2
@@ -149,10 +159,10 @@ def client_seed():
     """
     N, g, k  = get_prime()
     a = random.randrange(0, 1 << SRP_KEY_SIZE)
-    A = pow(g, a, N)
+    A = powmod(g, a, N)
     if DEBUG:
         a = DEBUG_PRIVATE_KEY
-        A = pow(g, a, N)
+        A = powmod(g, a, N)
     if DEBUG_PRINT:
         print('A=', binascii.b2a_hex(long2bytes(A)), end='\n')
         print('a=', binascii.b2a_hex(long2bytes(a)), end='\n')
@@ -165,12 +175,12 @@ def server_seed(v):
     """
     N, g, k = get_prime()
     b = random.randrange(0, 1 << SRP_KEY_SIZE)
-    gb = pow(g, b, N)
+    gb = powmod(g, b, N)
     kv = (k * v) % N
     B = (kv + gb) % N
     if DEBUG:
         b = DEBUG_PRIVATE_KEY
-        gb = pow(g, b, N)
+        gb = powmod(g, b, N)
         kv = (k * v) % N
         B = (kv + gb) % N
     if DEBUG_PRINT:
@@ -178,6 +188,17 @@ def server_seed(v):
         print('b=', binascii.b2a_hex(long2bytes(b)), end='\n')
     return B, b
 
+_n1 = None
+def _get_n1():
+    "H(N) ^ H(g), constant part of client proof"
+    global _n1
+    if _n1 is None:
+        N, g, k = get_prime()
+        n1 = bytes2long(sha1(N))
+        n2 = bytes2long(sha1(g))
+        _n1 = powmod(n1, n2, N)
+    return _n1
+
 def client_session(user, password, salt, A, B, a):
     """
     Client session secret
@@ -190,12 +211,12 @@ def client_session(user, password, salt, A, B, a):
     N, g, k = get_prime()
     u = get_scramble(A, B)
     x = getUserHash(salt, user, password)   # x
-    gx = pow(g, x, N)                       # g^x
+    gx = powmod(g, x, N)                    # g^x
     kgx = (k * gx) % N                      # kg^x
     diff = (B - kgx) % N                    # B - kg^x
     ux = (u * x) % N
     aux = (a + ux) % N
-    session_secret = pow(diff, aux, N)      # (B - kg^x) ^ (a + ux)
+    session_secret = powmod(diff, aux, N)   # (B - kg^x) ^ (a + ux)
     K = sha1(session_secret)
 
     return K
@@ -211,9 +232,9 @@ def server_session(user, password, salt, A, B, b):
     N, g, k = get_prime()
     u = get_scramble(A, B)
     v = get_verifier(user, password, salt)
-    vu = pow(v, u, N)                       # v^u
+    vu = powmod(v, u, N)                    # v^u
     Avu = (A * vu) % N                      # Av^u
-    session_secret = pow(Avu, b, N)         # (Av^u) ^ b
+    session_secret = powmod(Avu, b, N)      # (Av^u) ^ b
     K = sha1(session_secret)
     if DEBUG_PRINT:
         print('server session_secret=',
@@ -229,9 +250,7 @@ def client_proof(user, password, salt, A, B, a):
     N, g, k = get_prime()
     K = client_session(user, password, salt, A, B, a)
 
-    n1 = bytes2long(sha1(N))
-    n2 = bytes2long(sha1(g))
-    n1 = pow(n1, n2, N)
+    n1 = _get_n1()
     n2 = bytes2long(sha1(user))
     M = sha1(n1, n2, salt, A, B, K)
     if DEBUG_PRINT:
@@ -251,7 +270,7 @@ def get_salt():
 def get_verifier(user, password, salt):
     N, g, k = get_prime()
     x = getUserHash(salt, user, password)
-    return pow(g, x, N)
+    return powmod(g, x, N)
 
 if __name__ == '__main__':
     """
@@ -7,6 +7,8 @@ from firebirdsql.tests.test_event import *
 from firebirdsql.tests.test_arc4 import *
 from firebirdsql.tests.test_auth import *
 from firebirdsql.tests.test_utils import *
+from firebirdsql.tests.test_socketstream import *
+from firebirdsql.tests.test_wireprotocol import *
 
 if __name__ == "__main__":
     import unittest
@@ -1,5 +1,5 @@
 import unittest
-from firebirdsql.arc4 import Arc4
+from firebirdsql.arc4 import Arc4, get_translator
 
 class TestArc4(unittest.TestCase):
     def test_arc4(self):
@@ -10,3 +10,11 @@ class TestArc4(unittest.TestCase):
         plain = a2.translate(enc)
         self.assertEqual(plain, b'plain text')
 
+    def test_translator(self):
+        a1 = get_translator(b'a key')
+        enc = a1.translate(b'plain ')
+        enc += a1.translate(b'text')
+        self.assertEqual(enc, b'\x4b\x4b\xdc\x65\x02\xb3\x08\x17\x48\x82')
+        a2 = get_translator(b'a key')
+        plain = a2.translate(enc)
+        self.assertEqual(plain, b'plain text')
@@ -0,0 +1,55 @@
+import os
+import socket
+import unittest
+from firebirdsql.socketstream import SocketStream
+from firebirdsql.arc4 import Arc4
+
+
+class TestSocketStream(unittest.TestCase):
+    def setUp(self):
+        a, self.peer = socket.socketpair()
+        self.stream = SocketStream.__new__(SocketStream)
+        self.stream._attach(a, None)
+        self.stream.read_buffer_size = 16
+
+    def tearDown(self):
+        self.stream.close()
+        self.peer.close()
+
+    def test_small_reads(self):
+        self.peer.sendall(b'abcdefgh')
+        self.assertEqual(self.stream.read(1), b'a')
+        self.assertEqual(self.stream.read(3), b'bcd')
+        self.assertEqual(self.stream.read(4), b'efgh')
+
+    def test_straddle_refill(self):
+        data = os.urandom(40)
+        self.peer.sendall(data[:10])
+        self.assertEqual(self.stream.read(8), data[:8])
+        self.peer.sendall(data[10:])
+        # 2 bytes left in the buffer, the rest comes from the next recv()
+        self.assertEqual(self.stream.read(12), data[8:20])
+        self.assertEqual(self.stream.read(20), data[20:])
+
+    def test_larger_than_buffer(self):
+        data = os.urandom(5000)
+        self.peer.sendall(data)
+        self.assertEqual(self.stream.read(4), data[:4])
+        self.assertEqual(self.stream.read(4990), data[4:4994])
+        self.assertEqual(self.stream.read(6), data[4994:])
+
+    def test_translator(self):
+        data = os.urandom(100)
+        self.stream.set_translator(Arc4(b'a key'), Arc4(b'a key'))
+        self.peer.sendall(Arc4(b'a key').translate(data))
+        self.assertEqual(self.stream.read(30) + self.stream.read(70), data)
+        self.stream.send(b'plain text')
+        self.assertEqual(Arc4(b'a key').translate(self.peer.recv(100)),
+                         b'plain text')
+
+    def test_eof(self):
+        self.peer.sendall(b'abcdef')
+        self.peer.close()
+        self.assertEqual(self.stream.recv(3), b'abc')
+        self.assertEqual(self.stream.read(10), b'def')
+        self.assertEqual(self.stream.read(4), b'')
@@ -9,4 +9,12 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(b, b'712C5F8A2DB82464C4D640AE971025AA50AB64906D4F044F822E8AF8A58ADABBDBE1EFABA00BCCD4CDAA8A955BC43C3600BEAB9EBB9BD41ACC56E37F1A48F17293F24E876B53EEA6A60712D3F943769056B63202416827B400E162A8C0938D482274307585E0BC1D9DD52EFA7330B28E41B7CFCEFD9E8523FD11440EE5DE93A8')
         self.assertEqual(utils.bytes_to_hex(b), s)
 
-
+    def test_int_to_bytes(self):
+        self.assertEqual(utils.bint_to_bytes(1, 4), b'\x00\x00\x00\x01')
+        self.assertEqual(utils.bint_to_bytes(-2, 4), b'\xff\xff\xff\xfe')
+        self.assertEqual(utils.bint_to_bytes(0xffffffff, 4), b'\xff\xff\xff\xff')
+        self.assertEqual(utils.bint_to_bytes(-12345, 8),
+                                        b'\xff\xff\xff\xff\xff\xff\xcf\xc7')
+        self.assertEqual(utils.int_to_bytes(1, 2), b'\x01\x00')
+        self.assertEqual(utils.int_to_bytes(-1, 4), b'\xff\xff\xff\xff')
+        self.assertEqual(utils.int_to_bytes(0x10203, 3), b'\x03\x02\x01')
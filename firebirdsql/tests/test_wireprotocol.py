@@ -0,0 +1,53 @@
+import struct
+import unittest
+from firebirdsql.consts import *
+from firebirdsql.xsqlvar import XSQLVAR
+from firebirdsql.wireprotocol import (_parse_event_block, _format_message,
+                                      calc_row_layout)
+
+
+def _event_block(counts):
+    b = b'\x01'
+    for name, n in counts:
+        b += struct.pack('B', len(name)) + name + struct.pack('<l', n)
+    return b
+
+
+def _xsqlvar(sqltype, sqllen):
+    x = XSQLVAR(lambda b: b.decode())
+    x.sqltype = sqltype
+    x.sqllen = sqllen
+    return x
+
+
+class TestWireProtocol(unittest.TestCase):
+    def test_parse_event_block(self):
+        b = _event_block([(b'event_a', 1), (b'b', 0), (b'event_c', 70000)])
+        self.assertEqual(_parse_event_block(b, lambda b: b.decode()),
+                         {'event_a': 1, 'b': 0, 'event_c': 70000})
+        self.assertEqual(_parse_event_block(b'\x01', lambda b: b.decode()), {})
+
+    def test_format_message(self):
+        args = ['a%d' % i for i in range(1, 11)]
+        self.assertEqual(_format_message('@1 and @10', args), 'a1 and a10')
+        self.assertEqual(_format_message('@2 @1 @2', ['x', 'y']), 'y x y')
+        # placeholder without argument is left as is
+        self.assertEqual(_format_message('table @1 column @2', ['T']),
+                         'table T column @2')
+        self.assertEqual(_format_message('no args', []), 'no args')
+
+    def test_calc_row_layout(self):
+        xsqlda = [
+            _xsqlvar(SQL_TYPE_LONG, 4),
+            _xsqlvar(SQL_TYPE_TEXT, 5),
+            _xsqlvar(SQL_TYPE_TIMESTAMP, 8),
+        ]
+        # value padded to 4 bytes, then 4 bytes null indicator
+        self.assertEqual(calc_row_layout(xsqlda), (32, [
+            (0, 0, 4, 4, 8),
+            (1, 8, 13, 16, 20),
+            (2, 20, 28, 28, 32),
+        ]))
+        # a variable length column has no fixed layout
+        xsqlda.insert(1, _xsqlvar(SQL_TYPE_VARYING, 10))
+        self.assertEqual(calc_row_layout(xsqlda), (None, None))
@@ -69,35 +69,24 @@ def bytes_to_int(b, u=False):            # Read as little endian.
         raise InternalError
     return struct.unpack(fmt, b)[0]
 
-def bint_to_bytes(val, nbytes): # Convert int value to big endian bytes.
-    v = abs(val)
-    b = []
-    for n in range(nbytes):
-        b.append((v >> (8*(nbytes - n - 1)) & 0xff))
-    if val < 0:
-        for i in range(nbytes):
-            b[i] = ~b[i] + 256
-        b[-1] += 1
-        for i in range(nbytes):
-            if b[nbytes -i -1] == 256:
-                b[nbytes -i -1] = 0
-                b[nbytes -i -2] += 1
+_bint_fmt = {1: 'b', 2: '>h', 4: '>l', 8: '>q'}
+_int_fmt = {1: 'b', 2: '<h', 4: '<l', 8: '<q'}
+
+def _int_to_bytes(val, nbytes, fmtmap, big_endian):
+    fmt = fmtmap.get(nbytes)
+    if fmt is not None and -(1 << (nbytes*8-1)) <= val < (1 << (nbytes*8-1)):
+        return struct.pack(fmt, val)
+    # out of signed range or unusual size: keep the lowest nbytes
+    b = [(val >> (8 * n)) & 0xff for n in range(nbytes)]
+    if big_endian:
+        b.reverse()
     return bs(b)
 
+def bint_to_bytes(val, nbytes): # Convert int value to big endian bytes.
+    return _int_to_bytes(val, nbytes, _bint_fmt, True)
+
 def int_to_bytes(val, nbytes):  # Convert int value to little endian bytes.
-    v = abs(val)
-    b = []
-    for n in range(nbytes):
-        b.append((v >> (8 * n)) & 0xff)
-    if val < 0:
-        for i in range(nbytes):
-            b[i] = ~b[i] + 256
-        b[0] += 1
-        for i in range(nbytes):
-            if b[i] == 256:
-                b[i] = 0
-                b[i+1] += 1
-    return bs(b)
+    return _int_to_bytes(val, nbytes, _int_fmt, False)
 
 def byte_to_int(b):
     "byte to int"
@@ -9,8 +9,9 @@
 from __future__ import print_function
 import sys
 import os
+import re
 import socket
-import xdrlib, time, datetime, decimal, struct, select
+import time, datetime, decimal, struct
 from firebirdsql.fberrmsgs import messages
 from firebirdsql import (DisconnectByPeer,
     DatabaseError, InternalError, OperationalError,
@@ -19,7 +20,7 @@ from firebirdsql import (DisconnectByPeer,
 from firebirdsql.consts import *
 from firebirdsql.utils import *
 from firebirdsql import srp
-from firebirdsql.arc4 import Arc4
+from firebirdsql.arc4 import get_translator
 
 DEBUG = False
 
@@ -45,22 +46,190 @@ INFO_SQL_SELECT_DESCRIBE_VARS = bs([
     isc_info_sql_alias,
     isc_info_sql_describe_end])
 
+_S_H = struct.Struct('<H')   # BLR length field (little endian)
+
+_NULL4 = b'\x00\x00\x00\x00'   # null indicator of a not NULL value
+
+_PACK_BE_I = struct.Struct('>i').pack
+_UNPACK_BE_I_FROM = struct.Struct('>i').unpack_from
+
+# XDR templates for fixed shape wire operations
+_S_II = struct.Struct('>ii')
+_S_III = struct.Struct('>iii')
+_S_IIII = struct.Struct('>iiii')
+_S_IIIII = struct.Struct('>iiiii')
+
+_S_BBBB = struct.Struct('>BBBB')  # IPv4 address
+_S_EVENT_COUNT = struct.Struct('<l')  # EPB event count (little endian)
+
+# op_connect_request response: handle, object id, address length,
+# sin_family, sin_port, sin_addr
+_S_CONNECT_REQUEST = struct.Struct('>i8xihH4s')
+
+# zero padding to 4 bytes boundary, indexed by pad length
+_PAD4 = (b'', b'\x00', b'\x00\x00', b'\x00\x00\x00')
+
+def _xdr_bytes(b):
+    "XDR opaque data: length, bytes and padding to 4 bytes boundary"
+    ln = len(b)
+    return _PACK_BE_I(ln) + b + _PAD4[(-ln) & 3]
+
+class _XdrBuf(object):
+    "Reusable XDR packer, a subset of xdrlib.Packer over a bytearray."
+    def __init__(self):
+        self.buf = bytearray()
+
+    def reset(self):
+        del self.buf[:]
+
+    def pack_int(self, v):
+        self.buf += _PACK_BE_I(v)
+
+    def pack_bytes(self, b):
+        ln = len(b)
+        self.buf += _PACK_BE_I(ln)
+        self.buf += b
+        self.buf += _PAD4[(-ln) & 3]
+
+    pack_string = pack_bytes
+
+    def get_buffer(self):
+        return bytes(self.buf)
+
+
+_ARG_RE = re.compile(r'@(\d+)')
+
+def _format_message(template, args):
+    "Replace @1, @2 ... in error message template with args"
+    def arg(m):
+        i = int(m.group(1))
+        return args[i-1] if 0 < i <= len(args) else m.group(0)
+    return _ARG_RE.sub(arg, template)
+
+def _parse_event_block(b, bytes_to_str):
+    "Parse EPB to {event name: count}"
+    b = bytearray(b)
+    assert b[0] == 1    # EPB_version1
+    event_names = {}
+    i = 1
+    while i < len(b):
+        name_end = i + 1 + b[i]
+        s = bytes_to_str(bytes(b[i+1:name_end]))
+        event_names[s] = _S_EVENT_COUNT.unpack_from(b, name_end)[0]
+        i = name_end + 4
+    return event_names
+
+def calc_row_layout(xsqlda):
+    """Calculate the wire layout of a row of XSQLVAR array.
+    Return (row length, [(column, value start, value end,
+    null indicator start, null indicator end), ...]),
+    or (None, None) if some column is variable length."""
+    layout = []
+    i = 0
+    for j, x in enumerate(xsqlda):
+        ln = x.io_length()
+        if ln < 0:
+            return None, None
+        k = i + ((ln + 3) & ~3)
+        layout.append((j, i, i + ln, k, k + 4))
+        i = k + 4
+    return i, layout
+
 def convert_date(v):  # Convert datetime.date to BLR format data
-    i = v.month + 9
-    jy = v.year + (i // 12) -1
-    jm = i % 12
-    c = jy // 100
-    jy -= 100 * c
-    j = (146097*c) // 4 + (1461*jy) // 4 + (153*jm+2) // 5 + v.day - 678882
-    return bint_to_bytes(j, 4)
+    # days since 1858-11-17 (Modified Julian Day)
+    return _PACK_BE_I(v.toordinal() - 678576)
 
 def convert_time(v):  # Convert datetime.time to BLR format time
     t = (v.hour*3600 + v.minute*60 + v.second) *10000 + v.microsecond // 100
-    return bint_to_bytes(t, 4)
+    return _PACK_BE_I(t)
 
 def convert_timestamp(v):   # Convert datetime.datetime to BLR format timestamp
     return convert_date(v.date()) + convert_time(v.time())
 
+# BLR emitters used by WireProtocol.params_to_blr().
+# Each one appends the BLR description of parameter p to blr and its
+# data to values.
+def _emit_varchar(b, blr, values):
+    nbytes = len(b)
+    values.extend(b)
+    values.extend(_PAD4[(-nbytes) & 3])
+    blr.append(14)
+    blr.extend(_S_H.pack(nbytes))
+
+def _emit_bytes(wp, trans_handle, p, blr, values):
+    if len(p) > MAX_CHAR_LENGTH:
+        values.extend(wp._create_blob(trans_handle, p))
+        blr.extend(b'\x09\x00')
+    else:
+        _emit_varchar(p, blr, values)
+
+def _emit_text(wp, trans_handle, p, blr, values):
+    _emit_bytes(wp, trans_handle, wp.str_to_bytes(p), blr, values)
+
+def _emit_int(wp, trans_handle, p, blr, values):
+    values.extend(bint_to_bytes(p, 4))
+    blr.extend(b'\x08\x00')    # blr_long
+
+def _emit_decimal(wp, trans_handle, p, blr, values):
+    (sign, digits, exponent) = p.as_tuple()
+    v = 0
+    for d in digits:
+        v = v * 10 + d
+    if sign:
+        v *= -1
+    values.extend(bint_to_bytes(v, 8))
+    if exponent < 0:
+        exponent += 256
+    blr.append(16)
+    blr.append(exponent)
+
+def _emit_float(wp, trans_handle, p, blr, values):
+    if p == float("inf"):
+        values.extend(b'\x7f\x80\x00\x00')
+        blr.append(10)
+    else:
+        _emit_decimal(wp, trans_handle, decimal.Decimal(str(p)), blr, values)
+
+def _emit_date(wp, trans_handle, p, blr, values):
+    values.extend(convert_date(p))
+    blr.append(12)
+
+def _emit_time(wp, trans_handle, p, blr, values):
+    values.extend(convert_time(p))
+    blr.append(13)
+
+def _emit_timestamp(wp, trans_handle, p, blr, values):
+    values.extend(convert_timestamp(p))
+    blr.append(35)
+
+def _emit_bool(wp, trans_handle, p, blr, values):
+    values.extend(b'\x01\x00\x00\x00' if p else b'\x00\x00\x00\x00')
+    blr.append(23)
+
+def _emit_fallback(wp, trans_handle, p, blr, values):
+    # convert to string
+    if p is None:
+        v = b''
+    else:
+        v = wp.str_to_bytes(p.__repr__())
+    _emit_varchar(v, blr, values)
+
+_BLR_EMITTERS = {
+    int: _emit_int,
+    float: _emit_float,
+    decimal.Decimal: _emit_decimal,
+    datetime.date: _emit_date,
+    datetime.time: _emit_time,
+    datetime.datetime: _emit_timestamp,
+    bool: _emit_bool,
+}
+if PYTHON_MAJOR_VER == 3:
+    _BLR_EMITTERS[bytes] = _emit_bytes
+    _BLR_EMITTERS[str] = _emit_text
+else:
+    _BLR_EMITTERS[str] = _emit_bytes
+    _BLR_EMITTERS[unicode] = _emit_text
+
 def wire_operation(fn):
     if not DEBUG:
         return fn
@@ -73,6 +242,16 @@ def wire_operation(fn):
 
 class WireProtocol(object):
     buffer_length = 1024
+    pipeline_window = 16    # max pipelined op_put_segment requests
+    _dpb_base = None
+
+    def __getattr__(self, name):
+        # XDR packer shared by the _op_* methods, created on first use
+        if name == '_pkt':
+            self._pkt = _XdrBuf()
+            return self._pkt
+        raise AttributeError("%r object has no attribute %r" % (
+                                            type(self).__name__, name))
 
     op_connect = 1
     op_exit = 2
@@ -110,6 +289,7 @@ class WireProtocol(object):
     op_prepare_statement = 68
     op_info_sql = 70
     op_dummy = 71
+    _op_dummy_bytes = _PACK_BE_I(op_dummy)
     op_execute2 = 76
     op_sql_response = 78
     op_drop_database = 81
@@ -133,78 +313,85 @@ class WireProtocol(object):
     op_cond_accept = 98
 
     def recv_channel(self, nbytes, word_alignment=False):
-        n = nbytes
-        if word_alignment and (n % 4):
-            n += 4 - nbytes % 4  # 4 bytes word alignment
-        r = bs([])
-        while n:
-            if (self.timeout is not None
-                and select.select([self.sock._sock], [], [], self.timeout)[0] == []):
-                break
-            b = self.sock.recv(n)
-            if not b:
-                break
-            r += b
-            n -= len(b)
-        if len(r) < nbytes:
+        n = (nbytes + 3) & ~3 if word_alignment else nbytes
+        b = self.sock.read(n)
+        if len(b) < nbytes:
             raise OperationalError('Can not recv() packets')
-        return r[:nbytes]
+        return b[:nbytes] if n != nbytes else b
 
-    def str_to_bytes(self, s):
-        "convert str to bytes"
-        if (PYTHON_MAJOR_VER == 3 or
-                (PYTHON_MAJOR_VER == 2 and type(s)==unicode)):
+    if PYTHON_MAJOR_VER == 3:
+        def str_to_bytes(self, s):
+            "convert str to bytes"
             return s.encode(charset_map.get(self.charset, self.charset))
-        return s
 
-    def bytes_to_str(self, b):
-        "convert bytes array to raw string"
-        if PYTHON_MAJOR_VER == 3:
+        def bytes_to_str(self, b):
+            "convert bytes array to raw string"
             return b.decode(charset_map.get(self.charset, self.charset))
-        return b
+    else:
+        def str_to_bytes(self, s):
+            "convert str to bytes"
+            if type(s) == unicode:
+                return s.encode(charset_map.get(self.charset, self.charset))
+            return s
+
+        def bytes_to_str(self, b):
+            "convert bytes array to raw string"
+            return b
 
     def bytes_to_ustr(self, b):
         "convert bytes array to unicode string"
         return b.decode(charset_map.get(self.charset, self.charset))
 
+    def _recv_op_bytes(self):
+        "receive the next raw operation code, skipping op_dummy packets"
+        b = self.recv_channel(4)
+        while b == self._op_dummy_bytes:
+            b = self.recv_channel(4)
+        return b
+
+    def _recv_op(self):
+        "receive the next operation code, skipping op_dummy packets"
+        return _UNPACK_BE_I_FROM(self._recv_op_bytes())[0]
+
+    def _recv_int32(self):
+        "receive a big endian 32 bit integer"
+        return _UNPACK_BE_I_FROM(self.recv_channel(4))[0]
+
     def _parse_status_vector(self):
         sql_code = 0
         gds_codes = set()
-        message = ''
-        n = bytes_to_bint(self.recv_channel(4))
+        gds_code = 0
+        args = []
+        templates = []  # (message template, its arguments) per gds code
+        n = self._recv_int32()
         while n != isc_arg_end:
             if n == isc_arg_gds:
-                gds_code = bytes_to_bint(self.recv_channel(4))
+                gds_code = self._recv_int32()
                 if gds_code:
                     gds_codes.add(gds_code)
-                    message += messages.get(gds_code, '@1')
-                    num_arg = 0
+                    args = []
+                    templates.append((messages.get(gds_code, '@1'), args))
             elif n == isc_arg_number:
-                num = bytes_to_bint(self.recv_channel(4))
+                num = self._recv_int32()
                 if gds_code == 335544436:
                     sql_code = num
-                num_arg += 1
-                message = message.replace('@' + str(num_arg), str(num))
+                args.append(str(num))
             elif (n == isc_arg_string or
                     n == isc_arg_interpreted
                     or n == isc_arg_sql_state):
-                nbytes = bytes_to_bint(self.recv_channel(4))
-                s = str(self.recv_channel(nbytes, word_alignment=True))
-                num_arg += 1
-                message = message.replace('@' + str(num_arg), s)
-            elif n == isc_arg_sql_state:
-                nbytes = bytes_to_bint(self.recv_channel(4))
-                s = str(self.recv_channel(nbytes, word_alignment=True))
-            n = bytes_to_bint(self.recv_channel(4))
+                nbytes = self._recv_int32()
+                args.append(str(self.recv_channel(nbytes, word_alignment=True)))
+            n = self._recv_int32()
+        message = ''.join([_format_message(t, a) for t, a in templates])
 
         return (gds_codes, sql_code, message)
 
 
     def _parse_op_response(self):
         b = self.recv_channel(16)
-        h = bytes_to_bint(b[0:4])         # Object handle
+        h = _UNPACK_BE_I_FROM(b, 0)[0]      # Object handle
         oid = b[4:12]                       # Object ID
-        buf_len = bytes_to_bint(b[12:])   # buffer length
+        buf_len = _UNPACK_BE_I_FROM(b, 12)[0]   # buffer length
         buf = self.recv_channel(buf_len, word_alignment=True)
 
         (gds_codes, sql_code, message) = self._parse_status_vector()
@@ -225,11 +412,29 @@ class WireProtocol(object):
         self._op_create_blob2(trans_handle)
         (blob_handle, blob_id, buf) = self._op_response()
 
+        # Send up to pipeline_window op_put_segment requests before
+        # reading their responses.
         i = 0
         while i < len(b):
-            self._op_put_segment(blob_handle, b[i:i+BLOB_SEGMENT_SIZE])
-            (h, oid, buf) = self._op_response()
-            i += BLOB_SEGMENT_SIZE
+            n = 0
+            self.sock.cork()
+            try:
+                while n < self.pipeline_window and i < len(b):
+                    self._op_put_segment(blob_handle,
+                                         b[i:i+BLOB_SEGMENT_SIZE])
+                    i += BLOB_SEGMENT_SIZE
+                    n += 1
+            finally:
+                self.sock.uncork()
+            error = None
+            for _ in range(n):
+                try:
+                    (h, oid, buf) = self._op_response()
+                except OperationalError as e:
+                    if error is None:
+                        error = e
+            if error is not None:
+                raise error
 
         self._op_close_blob(blob_handle)
         (h, oid, buf) = self._op_response()
@@ -238,75 +443,16 @@ class WireProtocol(object):
     def params_to_blr(self, trans_handle, params):
         "Convert parameter array to BLR and values format."
         ln = len(params) * 2
-        blr = bs([5, 2, 4, 0, ln & 255, ln >> 8])
-        values = bs([])
+        blr = bytearray(b'\x05\x02\x04\x00\x00\x00')
+        _S_H.pack_into(blr, 4, ln)
+        values = bytearray()
         for p in params:
-            t = type(p)
-            if ((PYTHON_MAJOR_VER == 2 and type(p) == unicode) or
-                (PYTHON_MAJOR_VER == 3 and type(p) == str)):
-                p = self.str_to_bytes(p)
-                t = type(p)
-            if ((PYTHON_MAJOR_VER == 2 and t == str) or
-                (PYTHON_MAJOR_VER == 3 and t == bytes)):
-                if len(p) > MAX_CHAR_LENGTH:
-                    v = self._create_blob(trans_handle, p)
-                    blr += bs([9, 0])
-                else:
-                    v = p
-                    nbytes = len(v)
-                    pad_length = ((4-nbytes) & 3)
-                    v += bs([0]) * pad_length
-                    blr += bs([14, nbytes & 255, nbytes >> 8])
-            elif t == int:
-                v = bint_to_bytes(p, 4)
-                blr += bs([8, 0])    # blr_long
-            elif t == float and p == float("inf"):
-                v = b'\x7f\x80\x00\x00'
-                blr += bs([10])
-            elif t == decimal.Decimal or t == float:
-                if t == float:
-                    p = decimal.Decimal(str(p))
-                (sign, digits, exponent) = p.as_tuple()
-                v = 0
-                ln = len(digits)
-                for i in range(ln):
-                    v += digits[i] * (10 ** (ln -i-1))
-                if sign:
-                    v *= -1
-                v = bint_to_bytes(v, 8)
-                if exponent < 0:
-                    exponent += 256
-                blr += bs([16, exponent])
-            elif t == datetime.date:
-                v = convert_date(p)
-                blr += bs([12])
-            elif t == datetime.time:
-                v = convert_time(p)
-                blr += bs([13])
-            elif t == datetime.datetime:
-                v = convert_timestamp(p)
-                blr += bs([35])
-            elif t == bool:
-                v = bs([1, 0, 0, 0]) if p else bs([0, 0, 0, 0])
-                blr += bs([23])
-            else:   # fallback, convert to string
-                if p is None:
-                    v = bs([])
-                else:
-                    p = p.__repr__()
-                    if (PYTHON_MAJOR_VER==3 or
-                        (PYTHON_MAJOR_VER == 2 and type(p)==unicode)):
-                        p = self.str_to_bytes(p)
-                    v = p
-                nbytes = len(v)
-                pad_length = ((4-nbytes) & 3)
-                v += bs([0]) * pad_length
-                blr += bs([14, nbytes & 255, nbytes >> 8])
-            values += v
-            blr += bs([7, 0])
-            values += bs([0]) * 4 if p != None else bs([0xff,0xff,0xff,0xff])
-        blr += bs([255, 76])    # [blr_end, blr_eoc]
-        return blr, values
+            emit = _BLR_EMITTERS.get(type(p), _emit_fallback)
+            emit(self, trans_handle, p, blr, values)
+            blr.extend(b'\x07\x00')
+            values.extend(_NULL4 if p is not None else b'\xff\xff\xff\xff')
+        blr.extend(b'\xff\x4c')    # [blr_end, blr_eoc]
+        return bytes(blr), bytes(values)
 
     def uid(self, auth_plugin_list, wire_crypt):
         def pack_cnct_param(k, v):
@@ -368,6 +514,28 @@ class WireProtocol(object):
         r += pack_cnct_param(CNCT_user_verification, b'')
         return r
 
+    def _get_dpb_base(self):
+        "DPB items which are same for the session (charset, user, role)"
+        if self._dpb_base is not None:
+            return self._dpb_base
+        s = self.str_to_bytes(self.charset)
+        dpb = bs([isc_dpb_lc_ctype, len(s)]) + s
+        s = self.str_to_bytes(self.user)
+        dpb += bs([isc_dpb_user_name, len(s)]) + s
+        if self.accept_version < PROTOCOL_VERSION13:
+            enc_pass = get_crypt(self.password)
+            if self.accept_version == PROTOCOL_VERSION10 or not enc_pass:
+                s = self.str_to_bytes(self.password)
+                dpb += bs([isc_dpb_password, len(s)]) + s
+            else:
+                enc_pass = self.str_to_bytes(enc_pass)
+                dpb += bs([isc_dpb_password_enc, len(enc_pass)]) + enc_pass
+        if self.role:
+            s = self.str_to_bytes(self.role)
+            dpb += bs([isc_dpb_sql_role_name, len(s)]) + s
+        self._dpb_base = dpb
+        return dpb
+
     @wire_operation
     def _op_connect(self, auth_plugin_list, wire_crypt):
         arch_type = 36
@@ -378,7 +546,8 @@ class WireProtocol(object):
 #        more_protocol = hex_to_bytes('ffff800b00000001000000000000000500000004ffff800c00000001000000000000000500000006ffff800d00000001000000000000000500000008')
         # accept_type = 4
         more_protocol = hex_to_bytes('ffff800b00000001000000000000000400000004ffff800c00000001000000000000000400000006ffff800d00000001000000000000000400000008')
-        p = xdrlib.Packer()
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_connect)
         p.pack_int(self.op_attach)
         p.pack_int(3)   # CONNECT_VERSION
@@ -391,32 +560,20 @@ class WireProtocol(object):
         p.pack_int(min_arch_type)
         p.pack_int(max_arch_type)
         p.pack_int(2)   # Preference weight
-        self.sock.send(p.get_buffer()+more_protocol)
+        self.sock.sendmsg([p.get_buffer(), more_protocol])
 
     @wire_operation
     def _op_create(self, page_size=4096):
         dpb = bs([1])
         s = self.str_to_bytes(self.charset)
         dpb += bs([isc_dpb_set_db_charset, len(s)]) + s
-        dpb += bs([isc_dpb_lc_ctype, len(s)]) + s
-        s = self.str_to_bytes(self.user)
-        dpb += bs([isc_dpb_user_name, len(s)]) + s
-        if self.accept_version < PROTOCOL_VERSION13:
-            enc_pass = get_crypt(self.password)
-            if self.accept_version == PROTOCOL_VERSION10 or not enc_pass:
-                s = self.str_to_bytes(self.password)
-                dpb += bs([isc_dpb_password, len(s)]) + s
-            else:
-                enc_pass = self.str_to_bytes(enc_pass)
-                dpb += bs([isc_dpb_password_enc, len(enc_pass)]) + enc_pass
-        if self.role:
-            s = self.str_to_bytes(self.role)
-            dpb += bs([isc_dpb_sql_role_name, len(s)]) + s
+        dpb += self._get_dpb_base()
         dpb += bs([isc_dpb_sql_dialect, 4]) + int_to_bytes(3, 4)
         dpb += bs([isc_dpb_force_write, 4]) + int_to_bytes(1, 4)
         dpb += bs([isc_dpb_overwrite, 4]) + int_to_bytes(1, 4)
         dpb += bs([isc_dpb_page_size, 4]) + int_to_bytes(page_size, 4)
-        p = xdrlib.Packer()
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_create)
         p.pack_int(0)                       # Database Object ID
         p.pack_string(self.str_to_bytes(self.filename))
@@ -425,13 +582,9 @@ class WireProtocol(object):
 
     @wire_operation
     def _op_accept(self):
-        b = self.recv_channel(4)
-        while bytes_to_bint(b) == self.op_dummy:
-            b = self.recv_channel(4)
-        if bytes_to_bint(b) == self.op_reject:
+        op_code = self._recv_op()
+        if op_code == self.op_reject:
             raise OperationalError('Connection is rejected')
-
-        op_code = bytes_to_bint(b)
         if op_code == self.op_response:
             return self._parse_op_response()    # error occured
 
@@ -441,30 +594,15 @@ class WireProtocol(object):
         self.accept_type =  bytes_to_bint(b[8:])
 
         if op_code == self.op_cond_accept or op_code == self.op_accept_data:
-            read_length = 0
-
             ln = bytes_to_bint(self.recv_channel(4))
-            data = self.recv_channel(ln)
-            read_length += 4 + ln
-            if read_length % 4:
-                self.recv_channel(4 - read_length % 4) # padding
-                read_length += 4 - read_length % 4
+            data = self.recv_channel(ln, word_alignment=True)
 
             ln = bytes_to_bint(self.recv_channel(4))
-            self.plugin_name = self.recv_channel(ln)
-            read_length += 4 + ln
-            if read_length % 4:
-                self.recv_channel(4 - read_length % 4) # padding
-                read_length += 4 - read_length % 4
+            self.plugin_name = self.recv_channel(ln, word_alignment=True)
 
             is_authenticated = bytes_to_bint(self.recv_channel(4))
-            read_length += 4
             ln = bytes_to_bint(self.recv_channel(4))
-            keys = self.recv_channel(ln)
-            read_length += 4 + ln
-            if read_length % 4:
-                self.recv_channel(4 - read_length % 4) # padding
-                read_length += 4 - read_length % 4
+            keys = self.recv_channel(ln, word_alignment=True)
 
             if self.plugin_name == b'Legacy_Auth' and is_authenticated == 0:
                 raise OperationalError('Unauthorized')
@@ -483,7 +621,8 @@ class WireProtocol(object):
                                         server_public_key,
                                         self.client_private_key)
                 # send op_cont_auth
-                p = xdrlib.Packer()
+                p = self._pkt
+                p.reset()
                 p.pack_int(self.op_cont_auth)
                 p.pack_string(bytes_to_hex(client_proof))
                 p.pack_bytes(self.plugin_name)
@@ -493,35 +632,23 @@ class WireProtocol(object):
                 (h, oid, buf) = self._op_response()
 
                 # op_crypt: plugin[Arc4] key[Symmetric]
-                p = xdrlib.Packer()
+                p = self._pkt
+                p.reset()
                 p.pack_int(self.op_crypt)
                 p.pack_string(b'Arc4')
                 p.pack_string(b'Symmetric')
                 self.sock.send(p.get_buffer())
-                self.sock.set_translator(Arc4(auth_key), Arc4(auth_key))
+                self.sock.set_translator(
+                    get_translator(auth_key), get_translator(auth_key))
                 (h, oid, buf) = self._op_response()
         else:
             assert op_code == self.op_accept
 
     @wire_operation
     def _op_attach(self):
-        dpb = bs([1])
-        s = self.str_to_bytes(self.charset)
-        dpb += bs([isc_dpb_lc_ctype, len(s)]) + s
-        s = self.str_to_bytes(self.user)
-        dpb += bs([isc_dpb_user_name, len(s)]) + s
-        if self.accept_version < PROTOCOL_VERSION13:
-            enc_pass = get_crypt(self.password)
-            if self.accept_version == PROTOCOL_VERSION10 or not enc_pass:
-                s = self.str_to_bytes(self.password)
-                dpb += bs([isc_dpb_password, len(s)]) + s
-            else:
-                enc_pass = self.str_to_bytes(enc_pass)
-                dpb += bs([isc_dpb_password_enc, len(enc_pass)]) + enc_pass
-        if self.role:
-            s = self.str_to_bytes(self.role)
-            dpb += bs([isc_dpb_sql_role_name, len(s)]) + s
-        p = xdrlib.Packer()
+        dpb = bs([1]) + self._get_dpb_base()
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_attach)
         p.pack_int(0)                       # Database Object ID
         p.pack_string(self.str_to_bytes(self.filename))
@@ -532,10 +659,7 @@ class WireProtocol(object):
     def _op_drop_database(self):
         if self.db_handle is None:
             raise OperationalError('_op_drop_database() Invalid db handle')
-        p = xdrlib.Packer()
-        p.pack_int(self.op_drop_database)
-        p.pack_int(self.db_handle)
-        self.sock.send(p.get_buffer())
+        self.sock.send(_S_II.pack(self.op_drop_database, self.db_handle))
 
     @wire_operation
     def _op_service_attach(self):
@@ -545,7 +669,8 @@ class WireProtocol(object):
         s = self.str_to_bytes(self.password)
         dpb += bs([isc_spb_password, len(s)]) + s
         dpb += bs([isc_spb_dummy_packet_interval,0x04,0x78,0x0a,0x00,0x00])
-        p = xdrlib.Packer()
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_service_attach)
         p.pack_int(0)
         p.pack_string(self.str_to_bytes('service_mgr'))
@@ -556,7 +681,8 @@ class WireProtocol(object):
     def _op_service_info(self, param, item, buffer_length=512):
         if self.db_handle is None:
             raise OperationalError('_op_service_info() Invalid db handle')
-        p = xdrlib.Packer()
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_service_info)
         p.pack_int(self.db_handle)
         p.pack_int(0)
@@ -569,7 +695,8 @@ class WireProtocol(object):
     def _op_service_start(self, param):
         if self.db_handle is None:
             raise OperationalError('_op_service_start() Invalid db handle')
-        p = xdrlib.Packer()
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_service_start)
         p.pack_int(self.db_handle)
         p.pack_int(0)
@@ -580,16 +707,14 @@ class WireProtocol(object):
     def _op_service_detach(self):
         if self.db_handle is None:
             raise OperationalError('_op_service_detach() Invalid db handle')
-        p = xdrlib.Packer()
-        p.pack_int(self.op_service_detach)
-        p.pack_int(self.db_handle)
-        self.sock.send(p.get_buffer())
+        self.sock.send(_S_II.pack(self.op_service_detach, self.db_handle))
 
     @wire_operation
     def _op_info_database(self, b):
         if self.db_handle is None:
             raise OperationalError('_op_info_database() Invalid db handle')
-        p = xdrlib.Packer()
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_info_database)
         p.pack_int(self.db_handle)
         p.pack_int(0)
@@ -601,7 +726,8 @@ class WireProtocol(object):
     def _op_transaction(self, tpb):
         if self.db_handle is None:
             raise OperationalError('_op_transaction() Invalid db handle')
-        p = xdrlib.Packer()
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_transaction)
         p.pack_int(self.db_handle)
         p.pack_bytes(tpb)
@@ -609,44 +735,30 @@ class WireProtocol(object):
 
     @wire_operation
     def _op_commit(self, trans_handle):
-        p = xdrlib.Packer()
-        p.pack_int(self.op_commit)
-        p.pack_int(trans_handle)
-        self.sock.send(p.get_buffer())
+        self.sock.send(_S_II.pack(self.op_commit, trans_handle))
 
     @wire_operation
     def _op_commit_retaining(self, trans_handle):
-        p = xdrlib.Packer()
-        p.pack_int(self.op_commit_retaining)
-        p.pack_int(trans_handle)
-        self.sock.send(p.get_buffer())
+        self.sock.send(_S_II.pack(self.op_commit_retaining, trans_handle))
 
     @wire_operation
     def _op_rollback(self, trans_handle):
-        p = xdrlib.Packer()
-        p.pack_int(self.op_rollback)
-        p.pack_int(trans_handle)
-        self.sock.send(p.get_buffer())
+        self.sock.send(_S_II.pack(self.op_rollback, trans_handle))
 
     @wire_operation
     def _op_rollback_retaining(self, trans_handle):
-        p = xdrlib.Packer()
-        p.pack_int(self.op_rollback_retaining)
-        p.pack_int(trans_handle)
-        self.sock.send(p.get_buffer())
+        self.sock.send(_S_II.pack(self.op_rollback_retaining, trans_handle))
 
     @wire_operation
     def _op_allocate_statement(self):
         if self.db_handle is None:
             raise OperationalError('_op_allocate_statement() Invalid db handle')
-        p = xdrlib.Packer()
-        p.pack_int(self.op_allocate_statement)
-        p.pack_int(self.db_handle)
-        self.sock.send(p.get_buffer())
+        self.sock.send(_S_II.pack(self.op_allocate_statement, self.db_handle))
 
     @wire_operation
     def _op_info_transaction(self, trans_handle, b):
-        p = xdrlib.Packer()
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_info_transaction)
         p.pack_int(trans_handle)
         p.pack_int(0)
@@ -656,16 +768,13 @@ class WireProtocol(object):
 
     @wire_operation
     def _op_free_statement(self, stmt_handle, mode):
-        p = xdrlib.Packer()
-        p.pack_int(self.op_free_statement)
-        p.pack_int(stmt_handle)
-        p.pack_int(mode)
-        self.sock.send(p.get_buffer())
+        self.sock.send(_S_III.pack(self.op_free_statement, stmt_handle, mode))
 
     @wire_operation
     def _op_prepare_statement(self, stmt_handle, trans_handle, query, option_items=bs([])):
         desc_items = option_items + bs([isc_info_sql_stmt_type])+INFO_SQL_SELECT_DESCRIBE_VARS
-        p = xdrlib.Packer()
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_prepare_statement)
         p.pack_int(trans_handle)
         p.pack_int(stmt_handle)
@@ -677,7 +786,8 @@ class WireProtocol(object):
 
     @wire_operation
     def _op_info_sql(self, stmt_handle, vars):
-        p = xdrlib.Packer()
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_info_sql)
         p.pack_int(stmt_handle)
         p.pack_int(0)
@@ -687,7 +797,11 @@ class WireProtocol(object):
 
     @wire_operation
     def _op_execute(self, stmt_handle, trans_handle, params):
-        p = xdrlib.Packer()
+        # params_to_blr() may create blobs, which also use self._pkt
+        if len(params) != 0:
+            (blr, values) = self.params_to_blr(trans_handle, params)
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_execute)
         p.pack_int(stmt_handle)
         p.pack_int(trans_handle)
@@ -698,42 +812,45 @@ class WireProtocol(object):
             p.pack_int(0)
             self.sock.send(p.get_buffer())
         else:
-            (blr, values) = self.params_to_blr(trans_handle, params)
             p.pack_bytes(blr)
             p.pack_int(0)
             p.pack_int(1)
-            self.sock.send(p.get_buffer() + values)
+            self.sock.sendmsg([p.get_buffer(), values])
 
     @wire_operation
     def _op_execute2(self, stmt_handle, trans_handle, params, output_blr):
-        p = xdrlib.Packer()
+        # params_to_blr() may create blobs, which also use self._pkt
+        if len(params) != 0:
+            (blr, values) = self.params_to_blr(trans_handle, params)
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_execute2)
         p.pack_int(stmt_handle)
         p.pack_int(trans_handle)
 
         if len(params) == 0:
+            values = b''
             p.pack_bytes(bs([]))
             p.pack_int(0)
             p.pack_int(0)
-            self.sock.send(p.get_buffer())
         else:
-            (blr, values) = self.params_to_blr(trans_handle, params)
             p.pack_bytes(blr)
             p.pack_int(0)
             p.pack_int(1)
-            self.sock.send(p.get_buffer() + values)
 
-        p = xdrlib.Packer()
+        header = p.get_buffer()
+        p.reset()
         p.pack_bytes(output_blr)
         p.pack_int(0)
-        self.sock.send(p.get_buffer())
+        self.sock.sendmsg([header, values, p.get_buffer()])
 
     @wire_operation
     def _op_exec_immediate(self, trans_handle, query):
         if self.db_handle is None:
             raise OperationalError('_op_exec_immediate() Invalid db handle')
         desc_items = bs([])
-        p = xdrlib.Packer()
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_exec_immediate)
         p.pack_int(trans_handle)
         p.pack_int(self.db_handle)
@@ -745,119 +862,108 @@ class WireProtocol(object):
 
     @wire_operation
     def _op_fetch(self, stmt_handle, blr):
-        p = xdrlib.Packer()
-        p.pack_int(self.op_fetch)
-        p.pack_int(stmt_handle)
-        p.pack_bytes(blr)
-        p.pack_int(0)
-        p.pack_int(400)
-        self.sock.send(p.get_buffer())
+        self.sock.send(_S_II.pack(self.op_fetch, stmt_handle)
+                        + _xdr_bytes(blr) + _S_II.pack(0, 400))
 
     @wire_operation
-    def _op_fetch_response(self, stmt_handle, xsqlda):
-        b = self.recv_channel(4)
-        while bytes_to_bint(b) == self.op_dummy:
-            b = self.recv_channel(4)
-        if bytes_to_bint(b) == self.op_response:
+    def _op_fetch_response(self, stmt_handle, xsqlda, row_layout=None):
+        op = self._recv_op()
+        if op == self.op_response:
             return self._parse_op_response()    # error occured
-        if bytes_to_bint(b) != self.op_fetch_response:
+        if op != self.op_fetch_response:
             raise InternalError
         b = self.recv_channel(8)
-        status = bytes_to_bint(b[:4])
-        count = bytes_to_bint(b[4:8])
+        (status, count) = _S_II.unpack(b)
         rows = []
+        n = len(xsqlda)
+        decoders = [x.value for x in xsqlda]
+        recv = self.recv_channel
+        if row_layout is None:
+            row_layout = calc_row_layout(xsqlda)
+        (row_len, layout) = row_layout
+        if layout is not None:
+            # Fixed length row. Receive a row and the next 12 bytes header
+            # at once and slice them.
+            while count:
+                b = recv(row_len + 12)
+                r = [None] * n
+                for j, lo, hi, k, k4 in layout:
+                    if b[k:k4] == _NULL4:     # Not NULL
+                        r[j] = decoders[j](b[lo:hi])
+                rows.append(r)
+                (op, status, count) = _S_III.unpack_from(b, row_len)
+            return rows, status != 100
+        io_lengths = [x.io_length() for x in xsqlda]
         while count:
-            r = [None] * len(xsqlda)
-            for i in range(len(xsqlda)):
-                x = xsqlda[i]
-                if x.io_length() < 0:
-                    b = self.recv_channel(4)
-                    ln = bytes_to_bint(b)
-                else:
-                    ln = x.io_length()
-                raw_value = self.recv_channel(ln, word_alignment=True)
-                if self.recv_channel(4) == bs([0]) * 4: # Not NULL
-                    r[i] = x.value(raw_value)
+            r = [None] * n
+            for i, ln in enumerate(io_lengths):
+                if ln < 0:
+                    ln = _UNPACK_BE_I_FROM(recv(4))[0]
+                raw_value = recv(ln, word_alignment=True)
+                if recv(4) == _NULL4:  # Not NULL
+                    r[i] = decoders[i](raw_value)
             rows.append(r)
-            b = self.recv_channel(12)
-            op = bytes_to_bint(b[:4])
-            status = bytes_to_bint(b[4:8])
-            count = bytes_to_bint(b[8:])
+            (op, status, count) = _S_III.unpack(recv(12))
         return rows, status != 100
 
     @wire_operation
     def _op_detach(self):
         if self.db_handle is None:
             raise OperationalError('_op_detach() Invalid db handle')
-        p = xdrlib.Packer()
-        p.pack_int(self.op_detach)
-        p.pack_int(self.db_handle)
-        self.sock.send(p.get_buffer())
+        self.sock.send(_S_II.pack(self.op_detach, self.db_handle))
 
     @wire_operation
     def _op_open_blob(self, blob_id, trans_handle):
-        p = xdrlib.Packer()
-        p.pack_int(self.op_open_blob)
-        p.pack_int(trans_handle)
-        self.sock.send(p.get_buffer() + blob_id)
+        self.sock.sendmsg([_S_II.pack(self.op_open_blob, trans_handle),
+                                                                blob_id])
 
     @wire_operation
     def _op_create_blob2(self, trans_handle):
-        p = xdrlib.Packer()
-        p.pack_int(self.op_create_blob2)
-        p.pack_int(0)
-        p.pack_int(trans_handle)
-        p.pack_int(0)
-        p.pack_int(0)
-        self.sock.send(p.get_buffer())
+        self.sock.send(
+            _S_IIIII.pack(self.op_create_blob2, 0, trans_handle, 0, 0))
 
     @wire_operation
     def _op_get_segment(self, blob_handle):
-        p = xdrlib.Packer()
-        p.pack_int(self.op_get_segment)
-        p.pack_int(blob_handle)
-        p.pack_int(self.buffer_length)
-        p.pack_int(0)
-        self.sock.send(p.get_buffer())
+        self.sock.send(_S_IIII.pack(
+            self.op_get_segment, blob_handle, self.buffer_length, 0))
 
     @wire_operation
     def _op_put_segment(self, blob_handle, b):
-        p = xdrlib.Packer()
-        p.pack_int(self.op_put_segment)
-        p.pack_int(blob_handle)
-        p.pack_int(len(b))
-        p.pack_int(len(b))
-        self.sock.send(p.get_buffer() + b)
+        ln = len(b)
+        self.sock.sendmsg(
+            [_S_IIII.pack(self.op_put_segment, blob_handle, ln, ln), b])
 
     @wire_operation
     def _op_batch_segments(self, blob_handle, seg_data):
+        # header, segment length (little endian), segment and padding
+        # assembled in one zero filled buffer
         ln = len(seg_data)
-        p = xdrlib.Packer()
-        p.pack_int(self.op_batch_segments)
-        p.pack_int(blob_handle)
-        p.pack_int(ln + 2)
-        p.pack_int(ln + 2)
-        pad_length = ((4-(ln+2)) & 3)
-        self.sock.send(p.get_buffer() 
-                + int_to_bytes(ln, 2) + seg_data + bs([0])*pad_length)
+        out = bytearray(18 + ln + ((-(ln + 2)) & 3))
+        _S_IIII.pack_into(out, 0, self.op_batch_segments, blob_handle,
+                                                            ln + 2, ln + 2)
+        _S_H.pack_into(out, 16, ln)
+        out[18:18+ln] = seg_data
+        if self.sock.write_translator:  # pure python Arc4 wants bytes
+            out = bytes(out)
+        self.sock.send(out)
 
     @wire_operation
     def _op_close_blob(self, blob_handle):
-        p = xdrlib.Packer()
-        p.pack_int(self.op_close_blob)
-        p.pack_int(blob_handle)
-        self.sock.send(p.get_buffer())
+        self.sock.send(_S_II.pack(self.op_close_blob, blob_handle))
 
     @wire_operation
     def _op_que_events(self, event_names, ast, args, event_id):
         if self.db_handle is None:
             raise OperationalError('_op_que_events() Invalid db handle')
-        params = bs([1])
+        encode = self.str_to_bytes
+        params = bytearray(b'\x01')     # EPB_version1
         for name, n in event_names.items():
-            params += bs([len(name)])
-            params += self.str_to_bytes(name)
-            params += int_to_bytes(n, 4)
-        p = xdrlib.Packer()
+            b = encode(name)
+            params.append(len(b))
+            params.extend(b)
+            params.extend(int_to_bytes(n, 4))
+        p = self._pkt
+        p.reset()
         p.pack_int(self.op_que_events)
         p.pack_int(self.db_handle)
         p.pack_bytes(params)
@@ -870,37 +976,25 @@ class WireProtocol(object):
     def _op_cancel_events(self, event_id):
         if self.db_handle is None:
             raise OperationalError('_op_cancel_events() Invalid db handle')
-        p = xdrlib.Packer()
-        p.pack_int(self.op_cancel_events)
-        p.pack_int(self.db_handle)
-        p.pack_int(event_id)
-        self.sock.send(p.get_buffer())
+        self.sock.send(
+            _S_III.pack(self.op_cancel_events, self.db_handle, event_id))
 
     @wire_operation
     def _op_connect_request(self):
         if self.db_handle is None:
             raise OperationalError('_op_connect_request() Invalid db handle')
-        p = xdrlib.Packer()
-        p.pack_int(self.op_connect_request)
-        p.pack_int(1)    # async
-        p.pack_int(self.db_handle)
-        p.pack_int(0)
-        self.sock.send(p.get_buffer())
+        self.sock.send(_S_IIII.pack(self.op_connect_request,
+                                    1,  # async
+                                    self.db_handle, 0))
 
-        b = self.recv_channel(4)
-        while bytes_to_bint(b) == self.op_dummy:
-            b = self.recv_channel(4)
-        if bytes_to_bint(b) != self.op_response:
+        if self._recv_op() != self.op_response:
             raise InternalError
 
-        h = bytes_to_bint(self.recv_channel(4))
-        self.recv_channel(8)  # garbase
-        ln = bytes_to_bint(self.recv_channel(4))
-        ln += ln % 4    # padding
-        family = bytes_to_bint(self.recv_channel(2))
-        port = bytes_to_bint(self.recv_channel(2), u=True)
-        b = self.recv_channel(4)
-        ip_address = '.'.join([str(byte_to_int(c)) for c in b])
+        # handle, object id (garbage), address length, sockaddr_in
+        (h, ln, family, port, b) = _S_CONNECT_REQUEST.unpack(
+                                                    self.recv_channel(24))
+        ln = (ln + 3) & ~3  # padding
+        ip_address = '%d.%d.%d.%d' % _S_BBBB.unpack(b)
         ln -= 8
         self.recv_channel(ln)
 
@@ -912,50 +1006,52 @@ class WireProtocol(object):
 
     @wire_operation
     def _op_response(self):
-        b = self.recv_channel(4)
-        if b is None:
-            return
-        while bytes_to_bint(b) == self.op_dummy:
-            b = self.recv_channel(4)
-        if bytes_to_bint(b) != self.op_response:
+        if self._recv_op() != self.op_response:
             raise InternalError
         return self._parse_op_response()
 
     @wire_operation
     def _op_event(self):
-        b = self.recv_channel(4)
-        while bytes_to_bint(b) == self.op_dummy:
-            b = self.recv_channel(4)
-        if bytes_to_bint(b) == self.op_response:
-            return self._parse_op_response()
-        if bytes_to_bint(b) == self.op_exit or bytes_to_bint(b) == self.op_exit:
-            raise DisconnectByPeer
-        if bytes_to_bint(b) != self.op_event:
+        handler = self._event_dispatch.get(self._recv_op_bytes())
+        if handler is None:
             raise InternalError
-        return self._parse_op_event()
+        return handler(self)
 
     @wire_operation
-    def _op_sql_response(self, xsqlda):
-        b = self.recv_channel(4)
-        while bytes_to_bint(b) == self.op_dummy:
-            b = self.recv_channel(4)
-        if bytes_to_bint(b) != self.op_sql_response:
+    def _op_sql_response(self, xsqlda, row_layout=None):
+        if self._recv_op() != self.op_sql_response:
             raise InternalError
 
-        b = self.recv_channel(4)
-        count = bytes_to_bint(b[:4])
+        recv = self.recv_channel
+        count = bytes_to_bint(recv(4))
         r = []
         if count == 0:
             return []
-        for i in range(len(xsqlda)):
-            x = xsqlda[i]
-            if x.io_length() < 0:
-                b = self.recv_channel(4)
-                ln = bytes_to_bint(b)
+        if row_layout is None:
+            row_layout = calc_row_layout(xsqlda)
+        (row_len, layout) = row_layout
+        if layout is not None:
+            # Fixed length row, receive it at once and slice it.
+            b = recv(row_len)
+            for j, lo, hi, k, k4 in layout:
+                if b[k:k4] == _NULL4:     # Not NULL
+                    r.append(xsqlda[j].value(b[lo:hi]))
+                else:
+                    r.append(None)
+            return r
+        for x in xsqlda:
+            ln = x.io_length()
+            if ln < 0:
+                ln = bytes_to_bint(recv(4))
+                raw_value = recv(ln, word_alignment=True)
+                null_ind = recv(4)
             else:
-                ln = x.io_length()
-            raw_value = self.recv_channel(ln, word_alignment=True)
-            if self.recv_channel(4) == bs([0]) * 4: # Not NULL
+                # value, padding and null indicator in one read
+                n = (ln + 3) & ~3
+                b = recv(n + 4)
+                raw_value = b[:ln]
+                null_ind = b[n:]
+            if null_ind == _NULL4:  # Not NULL
                 r.append(x.value(raw_value))
             else:
                 r.append(None)
@@ -964,32 +1060,41 @@ class WireProtocol(object):
     def _wait_for_event(self, timeout):
         event_names = {}
         event_id = 0
+        recv = self.recv_channel
+        op_dummy = self._op_dummy_bytes
+        op_exit = _PACK_BE_I(self.op_exit)
+        op_disconnect = _PACK_BE_I(self.op_disconnect)
+        op_event = _PACK_BE_I(self.op_event)
         while True:
-            b4 = self.recv_channel(4)
-            if b4 is None:
+            op = recv(4)
+            if op is None:
                 return None
-            op = bytes_to_bint(b4)
-            if op == self.op_dummy:
+            if op == op_dummy:
                 pass
-            elif op == self.op_exit or op == self.op_disconnect:
+            elif op == op_exit or op == op_disconnect:
                 break
-            elif op == self.op_event:
-                db_handle = bytes_to_int(self.recv_channel(4))
-                ln = bytes_to_bint(self.recv_channel(4))
-                b = self.recv_channel(ln, word_alignment=True)
-                assert byte_to_int(b[0]) == 1
-                i = 1
-                while i < len(b):
-                    ln = byte_to_int(b[i])
-                    s = self.connection.bytes_to_str(b[i+1:i+1+ln])
-                    n = bytes_to_int(b[i+1+ln:i+1+ln+4])
-                    event_names[s] = n
-                    i += ln + 5
-                self.recv_channel(8)  # ignore AST info
-
-                event_id = bytes_to_bint(self.recv_channel(4))
+            elif op == op_event:
+                db_handle = bytes_to_int(recv(4))
+                ln = bytes_to_bint(recv(4))
+                event_names = _parse_event_block(
+                                    recv(ln, word_alignment=True),
+                                    self.connection.bytes_to_str)
+                recv(8)  # ignore AST info
+
+                event_id = bytes_to_bint(recv(4))
                 break
             else:
                 raise InternalError
 
         return (event_id, event_names)
+
+    def _raise_disconnect(self):
+        raise DisconnectByPeer
+
+    # _op_event() handlers keyed by raw operation code
+    _event_dispatch = {
+        _PACK_BE_I(op_response): _parse_op_response,
+        _PACK_BE_I(op_event): _parse_op_event,
+        _PACK_BE_I(op_exit): _raise_disconnect,
+        _PACK_BE_I(op_disconnect): _raise_disconnect,
+    }